@@ -0,0 +1,102 @@
+import argparse
+import sys
+from typing import List
+from main import NewsApp
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser for single-shot commands.
+    
+    Returns:
+        argparse.ArgumentParser: Configured parser
+    """
+    parser = argparse.ArgumentParser(
+        prog="news",
+        description="Retrieve and summarize news articles in one command."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    search_parser = subparsers.add_parser("search", help="Search for news articles")
+    search_parser.add_argument("query", help="Search query")
+    search_parser.add_argument("--k", type=int, default=None,
+                               help="Number of articles to retrieve (default: articles per topic preference)")
+    search_parser.add_argument("--page", type=int, default=1, help="Page of results to show (default: 1)")
+    search_parser.add_argument("--summarize", action="store_true", help="Summarize the retrieved articles")
+    search_parser.add_argument("--summary-type", choices=["brief", "detailed"], default=None,
+                               help="Type of summary (default: summary type preference)")
+    
+    history_parser = subparsers.add_parser("history", help="Show recent search history")
+    history_parser.add_argument("--limit", type=int, default=10, help="Number of searches to show (default: 10)")
+    
+    return parser
+
+def run_search(app: NewsApp, args: argparse.Namespace) -> int:
+    """
+    Run the search command: retrieve and optionally summarize.
+    
+    Args:
+        app (NewsApp): News application
+        args (argparse.Namespace): Parsed arguments
+        
+    Returns:
+        int: Exit code
+    """
+    page_size = args.k or app.user_manager.get_preferences()["articles_per_topic"]
+    # Nothing will ask for the next page once this command exits
+    articles = app.search_news(args.query, page_size=page_size, page=args.page, prefetch=False)
+    
+    if not articles:
+        print("No articles found.")
+        return 1
+    
+    if args.summarize:
+        summaries = app.summarize_articles(articles, summary_type=args.summary_type)
+    else:
+        summaries = [None] * len(articles)
+    
+    for article, summary in zip(articles, summaries):
+        app.display_article(article, summary)
+    return 0
+
+def run_history(app: NewsApp, args: argparse.Namespace) -> int:
+    """
+    Run the history command.
+    
+    Args:
+        app (NewsApp): News application
+        args (argparse.Namespace): Parsed arguments
+        
+    Returns:
+        int: Exit code
+    """
+    history = app.user_manager.get_search_history(limit=args.limit)
+    
+    if not history:
+        print("No search history found.")
+        return 0
+    
+    for i, item in enumerate(history, 1):
+        timestamp = item["timestamp"].split("T")[0]
+        print(f"{i}. [{timestamp}] '{item['query']}' ({item['num_results']} results)")
+    return 0
+
+def main(argv: List[str] = None) -> int:
+    """
+    Parse arguments and run the selected command.
+    
+    Args:
+        argv (List[str], optional): Command-line arguments, defaults to sys.argv
+        
+    Returns:
+        int: Exit code
+    """
+    args = build_parser().parse_args(argv)
+    app = NewsApp()
+    
+    if args.command == "search":
+        return run_search(app, args)
+    return run_history(app, args)
+
+# Main entry point
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,35 +1,339 @@
+import atexit
+import functools
+import hashlib
 import os
-from typing import List, Dict, Any
+import pickle
+import shelve
+import uuid
+from typing import List, Dict, Any, Iterator, Optional
+import chromadb
+import faiss
 import numpy as np
+from chromadb.config import Settings
+import torch
+from langchain.docstore.document import Document
+from langchain.docstore.in_memory import InMemoryDocstore
 from langchain.embeddings import HuggingFaceBgeEmbeddings
+from langchain.embeddings.base import Embeddings
 from langchain.vectorstores import Chroma, FAISS
 
+def build_texts(titles: List[str],
+                descriptions: List[str],
+                contents: List[str],
+                max_tokens: int = 400) -> List[str]:
+    """
+    Combine article fields into embedding texts.
+    
+    Each text is capped at max_tokens whitespace tokens, near the encoder's
+    512-token limit, so the tokenizer never processes the overflow.
+    
+    Args:
+        titles (List[str]): Article titles
+        descriptions (List[str]): Article descriptions
+        contents (List[str]): Article contents
+        max_tokens (int): Maximum number of whitespace tokens per text
+        
+    Returns:
+        List[str]: Embedding texts
+    """
+    return [
+        " ".join(f"{title} {description} {content}".split()[:max_tokens])
+        for title, description, content in zip(titles, descriptions, contents)
+    ]
+
+class ONNXBGEEmbeddings(Embeddings):
+    """BGE embeddings served by an optimized, INT8-quantized ONNX Runtime export."""
+    
+    query_instruction = "Represent this sentence for searching relevant passages: "
+    
+    def __init__(self, model_name: str, onnx_directory: str = "bge-onnx", batch_size: int = 64):
+        """
+        Initialize the ONNX embeddings, exporting the model on first use.
+        
+        Args:
+            model_name (str): Hugging Face model to export
+            onnx_directory (str): Directory holding the exported ONNX model
+            batch_size (int): Number of texts per forward pass
+        """
+        # optimum is only needed for the ONNX backend
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+        
+        self.model_name = model_name
+        self.onnx_directory = onnx_directory
+        self.batch_size = batch_size
+        
+        quantized_directory = os.path.join(onnx_directory, "quantized")
+        if not os.path.isdir(quantized_directory):
+            self._export(quantized_directory)
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(quantized_directory)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            quantized_directory,
+            file_name="model_optimized_quantized.onnx",
+            provider="CPUExecutionProvider"
+        )
+    
+    def _export(self, quantized_directory: str) -> None:
+        """
+        Export, graph-optimize and dynamically quantize the model to INT8.
+        
+        Args:
+            quantized_directory (str): Directory to save the quantized model to
+        """
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTOptimizer, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoOptimizationConfig, AutoQuantizationConfig
+        from transformers import AutoTokenizer
+        
+        # O3 enables all ORT graph fusions; O4 adds FP16 and is GPU-only
+        model = ORTModelForFeatureExtraction.from_pretrained(self.model_name, export=True)
+        optimizer = ORTOptimizer.from_pretrained(model)
+        optimizer.optimize(
+            save_dir=self.onnx_directory,
+            optimization_config=AutoOptimizationConfig.O3()
+        )
+        
+        quantizer = ORTQuantizer.from_pretrained(self.onnx_directory, file_name="model_optimized.onnx")
+        quantizer.quantize(
+            save_dir=quantized_directory,
+            quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        )
+        AutoTokenizer.from_pretrained(self.model_name).save_pretrained(quantized_directory)
+    
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        """
+        Encode texts into normalized embeddings.
+        
+        Args:
+            texts (List[str]): Texts to encode
+            
+        Returns:
+            List[List[float]]: Embedding vectors
+        """
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + self.batch_size],
+                padding=True,
+                truncation=True,
+                max_length=512,
+                return_tensors="np"
+            )
+            outputs = self.model(**inputs)
+            # BGE uses the [CLS] token as the sentence embedding
+            cls = np.asarray(outputs.last_hidden_state)[:, 0]
+            cls = cls / np.linalg.norm(cls, axis=1, keepdims=True)
+            vectors.extend(cls.astype(np.float32).tolist())
+        return vectors
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a list of documents.
+        
+        Args:
+            texts (List[str]): Documents to embed
+            
+        Returns:
+            List[List[float]]: Embedding vectors
+        """
+        return self._encode([text.replace("\n", " ") for text in texts])
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a search query.
+        
+        Args:
+            text (str): Query to embed
+            
+        Returns:
+            List[float]: Embedding vector
+        """
+        return self._encode([self.query_instruction + text.replace("\n", " ")])[0]
+
 class EmbeddingEngine:
     """Creates and manages article embeddings for semantic search."""
     
-    def __init__(self, vector_db_type: str = "chroma", persist_directory: str = "db"):
+    text_fields = ("title", "description", "content")
+    metadata_fields = ("title", "source", "author", "url", "publishedAt", "urlToImage")
+    
+    def __init__(self,
+                 vector_db_type: str = "chroma",
+                 persist_directory: str = "db",
+                 backend: str = "torch",
+                 quantize: bool = True,
+                 compile_encoder: bool = False):
         """
         Initialize the embedding engine.
         
         Args:
-            vector_db_type (str): Type of vector database to use ("chroma" or "faiss")
+            vector_db_type (str): Type of vector database to use ("chroma", "faiss" or
+                                  "hnsw" for an in-memory index without persistence)
             persist_directory (str): Directory to store the vector database
+            backend (str): Embedding backend to use ("torch" or "onnx")
+            quantize (bool): Store HNSW vectors as FP16 scalar-quantized codes
+            compile_encoder (bool): Compile the torch encoder with torch.compile (slow first start)
         """
         self.vector_db_type = vector_db_type.lower()
         self.persist_directory = persist_directory
+        self.backend = backend.lower()
+        self.quantize = quantize
+        self.compile_encoder = compile_encoder
         
         # Initialize embeddings model
         self.model_name = "BAAI/bge-small-en-v1.5"
-        self.model_kwargs = {"device": "cpu"}
-        self.encode_kwargs = {"normalize_embeddings": True}
+        self.embeddings = self._create_embeddings()
+        
+        # Memoize query vectors so repeat searches skip the encoder
+        self._embed_query = functools.lru_cache(maxsize=1024)(self._embed_query_uncached)
         
-        self.embeddings = HuggingFaceBgeEmbeddings(
+        self.vector_db = None
+        self._hnsw_documents: List[Document] = []
+        self._chroma_client = None
+        self._faiss_mmapped = False
+        
+        # Persistent (model, backend, URL) -> (text hash, vector) cache so repeat articles skip the encoder
+        os.makedirs(self.persist_directory, exist_ok=True)
+        self._cache_lock = None
+        self._cache = self._open_cache(os.path.join(self.persist_directory, "emb_cache.db"))
+        atexit.register(self.close)
+    
+    def _open_cache(self, cache_path: str) -> shelve.Shelf:
+        """
+        Open the on-disk embedding cache, holding a lock on it for the engine's lifetime.
+        
+        The shelve backend does no locking of its own, so concurrent writers
+        (for example the CLI running next to the app) could corrupt it. If
+        another process holds the lock, this engine caches in memory only.
+        
+        Args:
+            cache_path (str): Path of the shelve database
+            
+        Returns:
+            shelve.Shelf: Embedding cache
+        """
+        lock_file = open(cache_path + ".lock", "a+b")
+        try:
+            # The OS releases these locks when the process exits, so none go stale
+            if os.name == "nt":
+                import msvcrt
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            print("Embedding cache is in use by another process; caching in memory for this session.")
+            return shelve.Shelf({})
+        
+        self._cache_lock = lock_file
+        return shelve.open(cache_path)
+    
+    def _get_chroma_client(self) -> chromadb.api.ClientAPI:
+        """
+        Get the Chroma client, opening it once per engine.
+        
+        Returns:
+            chromadb.api.ClientAPI: Persistent Chroma client
+        """
+        if self._chroma_client is None:
+            self._chroma_client = chromadb.PersistentClient(
+                path=self.persist_directory,
+                settings=Settings(
+                    persist_directory=self.persist_directory,
+                    is_persistent=True,
+                    anonymized_telemetry=False
+                )
+            )
+        return self._chroma_client
+    
+    def _create_embeddings(self) -> Embeddings:
+        """
+        Create the embeddings model for the configured backend.
+        
+        Returns:
+            Embeddings: LangChain embeddings model
+        """
+        if self.backend == "onnx":
+            self.device = "cpu"
+            return ONNXBGEEmbeddings(self.model_name)
+        if self.backend != "torch":
+            raise ValueError(f"Unsupported embedding backend: {self.backend}")
+        
+        self.device = os.environ.get("EMBED_DEVICE") or self._detect_device()
+        self.model_kwargs = {"device": self.device}
+        self.encode_kwargs = {
+            "normalize_embeddings": True,
+            "batch_size": 64 if self.device == "cpu" else 128,
+            "convert_to_numpy": True
+        }
+        
+        embeddings = HuggingFaceBgeEmbeddings(
             model_name=self.model_name,
             model_kwargs=self.model_kwargs,
             encode_kwargs=self.encode_kwargs
         )
         
-        self.vector_db = None
+        # Run the encoder in half precision: FP16 on GPU, BF16 on CPUs with
+        # native BF16 support; elsewhere BF16 is emulated and slower than FP32
+        if self.device != "cpu":
+            self.torch_dtype = torch.float16
+        elif self._cpu_supports_bf16():
+            self.torch_dtype = torch.bfloat16
+        else:
+            self.torch_dtype = torch.float32
+        embeddings.client.to(self.torch_dtype)
+        
+        if self.compile_encoder:
+            # Let Inductor fuse the encoder layers, then trigger compilation
+            # now rather than on the first user query
+            transformer = embeddings.client[0]
+            transformer.auto_model = torch.compile(
+                transformer.auto_model,
+                mode="reduce-overhead",
+                fullgraph=False,
+                dynamic=True
+            )
+            embeddings.embed_documents(["warmup"])
+        
+        return embeddings
+    
+    @staticmethod
+    def _cpu_supports_bf16() -> bool:
+        """
+        Check whether the CPU has native BF16 instructions (AVX-512 BF16 or AMX).
+        
+        Returns:
+            bool: True if BF16 matmuls run natively on this CPU
+        """
+        # These checks are private torch.cpu helpers, so treat missing ones as unsupported
+        checks = ("_is_avx512_bf16_supported", "_is_amx_tile_supported")
+        return any(getattr(torch.cpu, name, lambda: False)() for name in checks)
+    
+    @staticmethod
+    def _detect_device() -> str:
+        """
+        Pick the fastest available device for the encoder.
+        
+        Returns:
+            str: "cuda", "mps" or "cpu"
+        """
+        if torch.cuda.is_available():
+            return "cuda"
+        if torch.backends.mps.is_available():
+            return "mps"
+        return "cpu"
+    
+    def _embed_query_uncached(self, query: str) -> tuple:
+        """
+        Embed a search query.
+        
+        Args:
+            query (str): Search query
+            
+        Returns:
+            tuple: Query embedding, immutable so cached vectors cannot be modified
+        """
+        return tuple(self.embeddings.embed_query(query))
     
     def _prepare_documents(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -41,26 +345,180 @@ class EmbeddingEngine:
         Returns:
             List[Dict[str, Any]]: Prepared documents for embedding
         """
-        documents = []
+        # Skip duplicate URLs returned by NewsAPI
+        seen = set()
+        unique_articles = []
         for article in articles:
-            # Combine title, description, and content for embedding
-            text = f"{article['title']} {article['description']} {article['content']}"
-            doc = {
-                "id": article.get("url", ""),
-                "text": text,
-                "metadata": {
-                    "title": article.get("title", ""),
-                    "source": article.get("source", ""),
-                    "author": article.get("author", ""),
-                    "url": article.get("url", ""),
-                    "publishedAt": article.get("publishedAt", ""),
-                    "urlToImage": article.get("urlToImage", "")
-                }
-            }
-            documents.append(doc)
+            url = article.get("url", "")
+            if url and url in seen:
+                continue
+            seen.add(url)
+            unique_articles.append(article)
+        
+        # Gather each field into its own column once, then build texts and
+        # metadata column-wise instead of per-article dict lookups
+        columns = {
+            field: [article.get(field) or "" for article in unique_articles]
+            for field in self.text_fields + self.metadata_fields
+        }
+        
+        texts = build_texts(*(columns[field] for field in self.text_fields))
+        metadatas = [
+            dict(zip(self.metadata_fields, row))
+            for row in zip(*(columns[field] for field in self.metadata_fields))
+        ]
+        
+        documents = [
+            {"id": metadata["url"], "text": text, "metadata": metadata}
+            for text, metadata in zip(texts, metadatas)
+        ]
         
         return documents
     
+    def bucket_batches(self, texts: List[str], batch_size: Optional[int] = None) -> Iterator[List[int]]:
+        """
+        Group texts into batches of similar token length.
+        
+        Each batch is padded only to its own longest sequence, so short
+        headlines are not padded out to the length of full articles.
+        
+        Args:
+            texts (List[str]): Texts to batch
+            batch_size (int, optional): Maximum number of texts per batch; defaults
+                                        to the embedding backend's batch size
+            
+        Yields:
+            List[int]: Indices into texts for one batch, shortest batches first
+        """
+        if self.backend == "torch":
+            tokenizer = self.embeddings.client.tokenizer
+            batch_size = batch_size or self.encode_kwargs["batch_size"]
+        else:
+            tokenizer = self.embeddings.tokenizer
+            batch_size = batch_size or self.embeddings.batch_size
+        
+        lengths = tokenizer(texts, truncation=True, max_length=512, return_length=True)["length"]
+        order = np.argsort(lengths, kind="stable")
+        
+        for start in range(0, len(order), batch_size):
+            yield order[start:start + batch_size].tolist()
+    
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts, one length bucket at a time for the ONNX backend.
+        
+        SentenceTransformer already sorts by length within a call, so the
+        torch backend gets all texts at once.
+        
+        Args:
+            texts (List[str]): Texts to embed
+            
+        Returns:
+            List[List[float]]: Embedding vectors in the original order of texts
+        """
+        if self.backend == "torch":
+            return self.embeddings.embed_documents(texts)
+        
+        # Scatter each bucket's vectors back to the positions of its texts
+        vectors = [None] * len(texts)
+        for batch in self.bucket_batches(texts):
+            batch_vectors = self.embeddings.embed_documents([texts[i] for i in batch])
+            for index, vector in zip(batch, batch_vectors):
+                vectors[index] = vector
+        return vectors
+    
+    def _embed_documents(self, documents: List[Dict[str, Any]]) -> List[List[float]]:
+        """
+        Embed prepared documents, reusing cached vectors for unchanged articles.
+        
+        Args:
+            documents (List[Dict[str, Any]]): Prepared documents
+            
+        Returns:
+            List[List[float]]: Embedding vectors in the order of documents
+        """
+        vectors = [None] * len(documents)
+        digests = [hashlib.sha1(doc["text"].encode("utf-8")).hexdigest() for doc in documents]
+        
+        # Vectors differ per model and backend, so they are cached separately
+        cache_keys = [f"{self.model_name}|{self.backend}|{doc['id']}" for doc in documents]
+        
+        misses = []
+        for i, (doc, digest) in enumerate(zip(documents, digests)):
+            cached = self._cache.get(cache_keys[i]) if doc["id"] else None
+            if cached is not None and cached[0] == digest:
+                vectors[i] = cached[1]
+            else:
+                misses.append(i)
+        
+        if misses:
+            new_vectors = self._embed_texts([documents[i]["text"] for i in misses])
+            for i, vector in zip(misses, new_vectors):
+                vectors[i] = vector
+                if documents[i]["id"]:
+                    self._cache[cache_keys[i]] = (digests[i], list(vector))
+            self._cache.sync()
+        
+        return vectors
+    
+    def _new_hnsw_index(self, d: int, m: int) -> faiss.Index:
+        """
+        Create an empty HNSW index, storing FP16 codes when quantization is enabled.
+        
+        Args:
+            d (int): Vector dimension
+            m (int): Number of graph neighbours per node
+            
+        Returns:
+            faiss.Index: Empty HNSW index
+        """
+        if self.quantize:
+            # FP16 codes need no training, so vectors added later cannot be clipped
+            # by ranges learned from an earlier batch
+            return faiss.IndexHNSWSQ(d, faiss.ScalarQuantizer.QT_fp16, m)
+        return faiss.IndexHNSWFlat(d, m)
+    
+    def _build_faiss_index(self, vectors: np.ndarray) -> faiss.Index:
+        """
+        Build an approximate nearest-neighbour FAISS index sized to the corpus.
+        
+        Large corpora use IVF+PQ (inverted lists over 8-bit product codes);
+        below 1000 vectors there is too little data to train the quantizers,
+        so an HNSW graph (over FP16 codes when quantizing) is used instead.
+        
+        Args:
+            vectors (np.ndarray): float32 matrix of shape (n, d)
+            
+        Returns:
+            faiss.Index: Populated index
+        """
+        n, d = vectors.shape
+        
+        if n < 1000:
+            index = self._new_hnsw_index(d, 32)
+        else:
+            quantizer = faiss.IndexFlatL2(d)
+            index = faiss.IndexIVFPQ(quantizer, d, min(100, n // 40), 32, 8)
+            index.nprobe = 8
+        
+        if not index.is_trained:
+            index.train(vectors)
+        index.add(vectors)
+        return index
+    
+    @staticmethod
+    def _document_ids(documents: List[Dict[str, Any]]) -> List[str]:
+        """
+        Get vector database ids for documents, keyed by article URL.
+        
+        Args:
+            documents (List[Dict[str, Any]]): Prepared documents
+            
+        Returns:
+            List[str]: Document ids, with a random id for articles without a URL
+        """
+        return [doc["id"] or str(uuid.uuid4()) for doc in documents]
+    
     def create_vector_db(self, articles: List[Dict[str, Any]]) -> None:
         """
         Create a vector database from articles.
@@ -72,23 +530,136 @@ class EmbeddingEngine:
         texts = [doc["text"] for doc in documents]
         metadatas = [doc["metadata"] for doc in documents]
         
+        if self.vector_db_type not in ("chroma", "faiss", "hnsw"):
+            raise ValueError(f"Unsupported vector database type: {self.vector_db_type}")
+        
+        vectors = self._embed_documents(documents)
+        
         if self.vector_db_type == "chroma":
-            self.vector_db = Chroma.from_texts(
-                texts=texts,
-                embedding=self.embeddings,
-                metadatas=metadatas,
-                persist_directory=self.persist_directory
+            # Chroma has no from_embeddings constructor, so write the
+            # precomputed vectors straight into the collection
+            self.vector_db = Chroma(
+                client=self._get_chroma_client(),
+                embedding_function=self.embeddings
             )
-        elif self.vector_db_type == "faiss":
-            self.vector_db = FAISS.from_texts(
-                texts=texts,
-                embedding=self.embeddings,
+            self.vector_db._collection.upsert(
+                ids=self._document_ids(documents),
+                embeddings=vectors,
+                documents=texts,
                 metadatas=metadatas
             )
+        elif self.vector_db_type == "faiss":
+            index = self._build_faiss_index(np.asarray(vectors, dtype=np.float32))
+            ids = self._document_ids(documents)
+            docstore = InMemoryDocstore({
+                doc_id: Document(page_content=text, metadata=metadata)
+                for doc_id, text, metadata in zip(ids, texts, metadatas)
+            })
+            self.vector_db = FAISS(
+                embedding_function=self.embeddings,
+                index=index,
+                docstore=docstore,
+                index_to_docstore_id=dict(enumerate(ids))
+            )
             # Save FAISS index
             self.vector_db.save_local(self.persist_directory)
-        else:
-            raise ValueError(f"Unsupported vector database type: {self.vector_db_type}")
+        elif self.vector_db_type == "hnsw":
+            # Small result sets are searched in memory and never touch disk
+            vectors = np.asarray(vectors, dtype=np.float32)
+            index = self._new_hnsw_index(vectors.shape[1], 16)
+            index.hnsw.efConstruction = 40
+            index.add(vectors)
+            self.vector_db = index
+            self._hnsw_documents = [
+                Document(page_content=text, metadata=metadata)
+                for text, metadata in zip(texts, metadatas)
+            ]
+    
+    def add_articles(self, articles: List[Dict[str, Any]]) -> None:
+        """
+        Add articles to the vector database, reusing it across calls.
+        
+        The database is created (or, for Chroma and FAISS, opened from the
+        persist directory) on the first call. Articles whose URL is already
+        stored are not added again.
+        
+        Args:
+            articles (List[Dict[str, Any]]): List of article content
+        """
+        if self.vector_db is None:
+            has_saved_faiss = os.path.exists(os.path.join(self.persist_directory, "index.faiss"))
+            if self.vector_db_type == "chroma":
+                self.load_vector_db()
+            elif self.vector_db_type == "faiss" and has_saved_faiss and not self.load_vector_db():
+                # Creating a new index here would overwrite the saved one
+                raise RuntimeError(f"Saved FAISS index in {self.persist_directory} could not be loaded")
+        
+        if self.vector_db is None:
+            self.create_vector_db(articles)
+            return
+        
+        documents = self._prepare_documents(articles)
+        
+        if self.vector_db_type == "faiss":
+            stored_ids = set(self.vector_db.index_to_docstore_id.values())
+            documents = [doc for doc in documents if doc["id"] not in stored_ids]
+        elif self.vector_db_type == "hnsw":
+            stored_urls = {doc.metadata["url"] for doc in self._hnsw_documents}
+            documents = [doc for doc in documents if doc["id"] not in stored_urls]
+        
+        if not documents:
+            return
+        
+        texts = [doc["text"] for doc in documents]
+        metadatas = [doc["metadata"] for doc in documents]
+        vectors = self._embed_documents(documents)
+        
+        if self.vector_db_type == "chroma":
+            # Upsert keyed by URL so re-fetched articles overwrite their old entry
+            self.vector_db._collection.upsert(
+                ids=self._document_ids(documents),
+                embeddings=vectors,
+                documents=texts,
+                metadatas=metadatas
+            )
+        elif self.vector_db_type == "faiss":
+            if self._faiss_mmapped:
+                # A read-only mapping cannot grow (IVF lists or HNSW storage alike);
+                # read the index into memory before the first add of the session
+                self.vector_db.index = faiss.read_index(os.path.join(self.persist_directory, "index.faiss"))
+                self._faiss_mmapped = False
+            self.vector_db.add_embeddings(
+                text_embeddings=list(zip(texts, vectors)),
+                metadatas=metadatas,
+                ids=self._document_ids(documents)
+            )
+            self.vector_db.save_local(self.persist_directory)
+        elif self.vector_db_type == "hnsw":
+            self.vector_db.add(np.asarray(vectors, dtype=np.float32))
+            self._hnsw_documents.extend(
+                Document(page_content=text, metadata=metadata)
+                for text, metadata in zip(texts, metadatas)
+            )
+    
+    @staticmethod
+    def _faiss_mmap_flag(index_path: str) -> int:
+        """
+        Pick the FAISS memory-mapping flag for a saved index.
+        
+        Memory-mapping keeps only the pages searches touch resident. MMAP maps
+        IVF inverted lists and MMAP_IFC maps flat-code storage (such as the
+        codes of an HNSW index); the two cannot be combined on one read.
+        
+        Args:
+            index_path (str): Path to the saved index
+            
+        Returns:
+            int: FAISS IO flag
+        """
+        # IVF index files start with an "Iw..." fourcc
+        with open(index_path, "rb") as f:
+            fourcc = f.read(4)
+        return faiss.IO_FLAG_MMAP if fourcc.startswith(b"Iw") else faiss.IO_FLAG_MMAP_IFC
     
     def load_vector_db(self) -> bool:
         """
@@ -100,14 +671,24 @@ class EmbeddingEngine:
         try:
             if self.vector_db_type == "chroma":
                 self.vector_db = Chroma(
-                    persist_directory=self.persist_directory,
+                    client=self._get_chroma_client(),
                     embedding_function=self.embeddings
                 )
             elif self.vector_db_type == "faiss":
-                self.vector_db = FAISS.load_local(
-                    self.persist_directory,
-                    self.embeddings
+                index_path = os.path.join(self.persist_directory, "index.faiss")
+                index = faiss.read_index(index_path, self._faiss_mmap_flag(index_path) | faiss.IO_FLAG_READ_ONLY)
+                with open(os.path.join(self.persist_directory, "index.pkl"), "rb") as f:
+                    docstore, index_to_docstore_id = pickle.load(f)
+                self.vector_db = FAISS(
+                    embedding_function=self.embeddings,
+                    index=index,
+                    docstore=docstore,
+                    index_to_docstore_id=index_to_docstore_id
                 )
+                self._faiss_mmapped = True
+            elif self.vector_db_type == "hnsw":
+                # The in-memory index is not persisted between sessions
+                return self.vector_db is not None
             return True
         except Exception as e:
             print(f"Error loading vector database: {e}")
@@ -124,10 +705,17 @@ class EmbeddingEngine:
         Returns:
             List[Dict[str, Any]]: List of similar articles
         """
-        if not self.vector_db:
+        if self.vector_db is None:
             raise ValueError("Vector database not initialized. Please create or load a database first.")
         
-        results = self.vector_db.similarity_search(query, k=k)
+        query_vector = self._embed_query(query)
+        
+        if self.vector_db_type == "hnsw":
+            query_vector = np.asarray([query_vector], dtype=np.float32)
+            _, positions = self.vector_db.search(query_vector, min(k, len(self._hnsw_documents)))
+            results = [self._hnsw_documents[i] for i in positions[0] if i != -1]
+        else:
+            results = self.vector_db.similarity_search_by_vector(list(query_vector), k=k)
         
         similar_articles = []
         for doc in results:
@@ -138,6 +726,13 @@ class EmbeddingEngine:
             similar_articles.append(article)
         
         return similar_articles
+    
+    def close(self) -> None:
+        """Close the on-disk embedding cache and release its lock."""
+        self._cache.close()
+        if self._cache_lock is not None:
+            self._cache_lock.close()
+            self._cache_lock = None
 
 # Example usage
 if __name__ == "__main__":
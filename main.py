@@ -1,7 +1,11 @@
+import asyncio
 import os
 import sys
 import textwrap
-from typing import List, Dict, Any
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple
 from news_retriever import NewsRetriever
 from embedding_engine import EmbeddingEngine
 from summarizer import Summarizer
@@ -19,26 +23,69 @@ class NewsApp:
         # Initialize components
         try:
             self.news_retriever = NewsRetriever(self.news_api_key)
-            self.embedding_engine = EmbeddingEngine(vector_db_type="chroma")
+            self.embedding_engine = EmbeddingEngine(
+                vector_db_type=os.environ.get("VECTOR_DB_TYPE", "hnsw")
+            )
             self.summarizer = Summarizer(self.groq_api_key)
             self.user_manager = UserManager()
         except Exception as e:
             print(f"Error initializing components: {e}")
             sys.exit(1)
+        
+        # Background fetch of the next result page while the current one is viewed
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=1)
+        self._prefetched: Dict[Tuple[str, int, int], Tuple[float, Future]] = {}
+        self.prefetch_max_age = 300
+        # NewsAPI developer keys cannot page past the first 100 results
+        self.max_results = 100
+        
+        # Articles retrieved but not yet embedded, keyed by URL; see find_similar_articles
+        self._pending_articles: OrderedDict = OrderedDict()
+        self.max_pending_articles = 1000
     
-    def search_news(self, query: str, page_size: int = 10) -> List[Dict[str, Any]]:
+    def search_news(self,
+                    query: str,
+                    page_size: int = 10,
+                    page: int = 1,
+                    prefetch: bool = True) -> List[Dict[str, Any]]:
         """
         Search for news articles.
         
         Args:
             query (str): Search query
             page_size (int): Number of articles to retrieve
+            page (int): Page number of the results
+            prefetch (bool): Fetch the following page in the background so that
+                             asking for it next returns without waiting on the network
             
         Returns:
             List[Dict[str, Any]]: List of articles
         """
         try:
-            results = self.news_retriever.get_articles(query, page_size=page_size)
+            # Drop pages prefetched for other queries or too long ago to be fresh
+            now = time.monotonic()
+            for key, (fetched_at, future) in list(self._prefetched.items()):
+                if key[0] != query or now - fetched_at > self.prefetch_max_age:
+                    future.cancel()
+                    del self._prefetched[key]
+            
+            prefetched = self._prefetched.pop((query, page_size, page), None)
+            if prefetched is not None:
+                results = prefetched[1].result()
+            else:
+                results = self.news_retriever.get_articles(query, page_size=page_size, page=page)
+            
+            # Only spend a request on the next page when there is one
+            next_key = (query, page_size, page + 1)
+            has_next_page = (
+                results["status"] == "ok"
+                and results.get("totalResults", 0) > page * page_size
+                and page * page_size < self.max_results
+            )
+            if prefetch and has_next_page and next_key not in self._prefetched:
+                self._prefetched[next_key] = (now, self._prefetch_executor.submit(
+                    self.news_retriever.get_articles, query, page_size=page_size, page=page + 1
+                ))
             
             if results["status"] == "ok":
                 articles = self.news_retriever.extract_article_content(results["articles"])
@@ -51,6 +98,47 @@ class NewsApp:
             print(f"Error searching news: {e}")
             return []
     
+    def _stop_prefetching(self) -> None:
+        """Cancel queued page prefetches so exiting does not wait on them."""
+        for _, future in self._prefetched.values():
+            future.cancel()
+        self._prefetched.clear()
+        self._prefetch_executor.shutdown(wait=False)
+    
+    def search_news_many(self, queries: List[str], page_size: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Search for news articles on several queries concurrently.
+        
+        Args:
+            queries (List[str]): Search queries
+            page_size (int): Number of articles to retrieve per query
+            
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Articles for each query
+        """
+        async def fetch_all():
+            async with self.news_retriever.async_client() as client:
+                return await asyncio.gather(
+                    *[self.news_retriever.aget_articles(query, page_size=page_size, client=client)
+                      for query in queries],
+                    return_exceptions=True
+                )
+        
+        articles_by_query = {}
+        for query, results in zip(queries, asyncio.run(fetch_all())):
+            if isinstance(results, Exception):
+                print(f"Error searching news for '{query}': {results}")
+                articles_by_query[query] = []
+            elif results["status"] == "ok":
+                articles = self.news_retriever.extract_article_content(results["articles"])
+                self.user_manager.add_search_history(query, len(articles))
+                articles_by_query[query] = articles
+            else:
+                print(f"Error: {results.get('message', 'Unknown error')}")
+                articles_by_query[query] = []
+        
+        return articles_by_query
+    
     def add_articles_to_vector_db(self, articles: List[Dict[str, Any]]) -> None:
         """
         Add articles to the vector database.
@@ -59,15 +147,35 @@ class NewsApp:
             articles (List[Dict[str, Any]]): List of articles
         """
         try:
-            self.embedding_engine.create_vector_db(articles)
+            self.embedding_engine.add_articles(articles)
             print(f"Added {len(articles)} articles to vector database.")
         except Exception as e:
             print(f"Error adding articles to vector database: {e}")
     
+    def _queue_for_embedding(self, articles: List[Dict[str, Any]]) -> None:
+        """
+        Queue articles to be embedded on the next similarity search.
+        
+        Repeat articles are queued once, and the oldest are dropped once
+        max_pending_articles is reached.
+        
+        Args:
+            articles (List[Dict[str, Any]]): List of articles
+        """
+        for article in articles:
+            key = article.get("url") or article.get("title")
+            self._pending_articles[key] = article
+            self._pending_articles.move_to_end(key)
+        while len(self._pending_articles) > self.max_pending_articles:
+            self._pending_articles.popitem(last=False)
+    
     def find_similar_articles(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """
         Find articles similar to the query.
         
+        Articles retrieved since the last call are embedded first, so
+        browsing-only sessions never run the embedding model.
+        
         Args:
             query (str): Search query
             k (int): Number of results to return
@@ -75,6 +183,10 @@ class NewsApp:
         Returns:
             List[Dict[str, Any]]: List of similar articles
         """
+        if self._pending_articles:
+            self.add_articles_to_vector_db(list(self._pending_articles.values()))
+            self._pending_articles.clear()
+        
         try:
             return self.embedding_engine.search_similar_articles(query, k=k)
         except Exception as e:
@@ -101,6 +213,26 @@ class NewsApp:
             print(f"Error summarizing article: {e}")
             return "Error generating summary"
     
+    def summarize_articles(self, articles: List[Dict[str, Any]], summary_type: str = None) -> List[str]:
+        """
+        Generate summaries of several articles in one batch.
+        
+        Args:
+            articles (List[Dict[str, Any]]): List of articles
+            summary_type (str): Type of summary to generate (brief or detailed)
+            
+        Returns:
+            List[str]: Generated summaries, in the order of articles
+        """
+        if summary_type is None:
+            summary_type = self.user_manager.get_preferences()["summary_type"]
+        
+        try:
+            return self.summarizer.summarize_batch(articles, summary_type=summary_type)
+        except Exception as e:
+            print(f"Error summarizing articles: {e}")
+            return ["Error generating summary"] * len(articles)
+    
     def display_article(self, article: Dict[str, Any], summary: str = None) -> None:
         """
         Display an article with its summary.
@@ -152,6 +284,8 @@ class NewsApp:
             elif choice == "5":
                 self._update_preferences_menu()
             elif choice == "6":
+                self.user_manager.flush()
+                self._stop_prefetching()
                 print("Thank you for using News Summarizer App. Goodbye!")
                 break
             else:
@@ -176,19 +310,22 @@ class NewsApp:
         
         print(f"\nFound {len(articles)} articles.")
         
-        # Add articles to vector database
-        self.add_articles_to_vector_db(articles)
+        # Embed lazily, on the next similarity search
+        self._queue_for_embedding(articles)
         
         # Display articles
-        self._display_articles_menu(articles)
+        self._display_articles_menu(articles, query=query)
     
-    def _display_articles_menu(self, articles: List[Dict[str, Any]]) -> None:
+    def _display_articles_menu(self, articles: List[Dict[str, Any]], query: str = None) -> None:
         """
         Display articles menu.
         
         Args:
             articles (List[Dict[str, Any]]): List of articles
+            query (str, optional): Search query the articles came from, enables paging
         """
+        page = 1
+        
         while True:
             print("\nArticles:")
             for i, article in enumerate(articles, 1):
@@ -197,6 +334,8 @@ class NewsApp:
             print("\nOptions:")
             print("1-N. Select article to view")
             print("S. Summarize all articles")
+            if query:
+                print("M. More articles (next page)")
             print("B. Back to main menu")
             
             choice = input("\nEnter your choice: ")
@@ -205,6 +344,16 @@ class NewsApp:
                 break
             elif choice.upper() == "S":
                 self._summarize_all_articles(articles)
+            elif choice.upper() == "M" and query:
+                page_size = self.user_manager.get_preferences()["articles_per_topic"]
+                next_articles = self.search_news(query, page_size=page_size, page=page + 1)
+                
+                if not next_articles:
+                    print("No more articles found.")
+                else:
+                    page += 1
+                    articles = next_articles
+                    self._queue_for_embedding(articles)
             else:
                 try:
                     index = int(choice) - 1
@@ -259,9 +408,8 @@ class NewsApp:
         
         print(f"\nGenerating {summary_type} summaries for all articles...")
         
-        for i, article in enumerate(articles, 1):
-            print(f"Processing article {i}/{len(articles)}...")
-            summary = self.summarize_article(article, summary_type=summary_type)
+        summaries = self.summarize_articles(articles, summary_type=summary_type)
+        for article, summary in zip(articles, summaries):
             self.display_article(article, summary)
     
     def _view_saved_topics_menu(self) -> None:
@@ -279,12 +427,30 @@ class NewsApp:
             
             print("\nOptions:")
             print("1-N. Select topic to view news")
+            print("A. View news for all topics")
             print("B. Back to main menu")
             
             choice = input("\nEnter your choice: ")
             
             if choice.upper() == "B":
                 break
+            elif choice.upper() == "A":
+                print(f"\nSearching for {len(topics)} topics...")
+                
+                preferences = self.user_manager.get_preferences()
+                page_size = preferences["articles_per_topic"]
+                
+                articles_by_topic = self.search_news_many(topics, page_size=page_size)
+                articles = [article for topic in topics for article in articles_by_topic[topic]]
+                
+                if not articles:
+                    print("No articles found.")
+                else:
+                    # Embed lazily, on the next similarity search
+                    self._queue_for_embedding(articles)
+                    
+                    # Display articles
+                    self._display_articles_menu(articles)
             else:
                 try:
                     index = int(choice) - 1
@@ -300,11 +466,11 @@ class NewsApp:
                         if not articles:
                             print("No articles found.")
                         else:
-                            # Add articles to vector database
-                            self.add_articles_to_vector_db(articles)
+                            # Embed lazily, on the next similarity search
+                            self._queue_for_embedding(articles)
                             
                             # Display articles
-                            self._display_articles_menu(articles)
+                            self._display_articles_menu(articles, query=topic)
                     else:
                         print("Invalid topic number.")
                 except ValueError:
@@ -399,11 +565,11 @@ class NewsApp:
                 summary_choice = input("Enter your choice (1-2): ")
                 if summary_choice == "1":
                     preferences["summary_type"] = "brief"
-                    self.user_manager.update_preferences(preferences)
+                    self.user_manager.update_preferences({"summary_type": "brief"})
                     print("Summary type updated to 'brief'.")
                 elif summary_choice == "2":
                     preferences["summary_type"] = "detailed"
-                    self.user_manager.update_preferences(preferences)
+                    self.user_manager.update_preferences({"summary_type": "detailed"})
                     print("Summary type updated to 'detailed'.")
                 else:
                     print("Invalid choice.")
@@ -412,7 +578,7 @@ class NewsApp:
                     num = int(input("Enter number of articles per topic (1-20): "))
                     if 1 <= num <= 20:
                         preferences["articles_per_topic"] = num
-                        self.user_manager.update_preferences(preferences)
+                        self.user_manager.update_preferences({"articles_per_topic": num})
                         print(f"Articles per topic updated to {num}.")
                     else:
                         print("Number must be between 1 and 20.")
@@ -422,7 +588,7 @@ class NewsApp:
                 lang = input("Enter language code (e.g., 'en', 'fr', 'es'): ")
                 if lang and len(lang) == 2:
                     preferences["language"] = lang.lower()
-                    self.user_manager.update_preferences(preferences)
+                    self.user_manager.update_preferences({"language": lang.lower()})
                     print(f"Language updated to '{lang.lower()}'.")
                 else:
                     print("Invalid language code.")
@@ -1,5 +1,9 @@
+import httpx
+import orjson
 import requests
 import os
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
 
@@ -13,6 +17,58 @@ class NewsRetriever:
             raise ValueError("NewsAPI key is required. Please provide it or set NEWS_API_KEY environment variable.")
         self.base_url = "https://newsapi.org/v2/everything"
         
+        # Reuse one keep-alive connection pool for all queries
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Accept-Encoding": "gzip",
+            "X-Api-Key": self.api_key
+        })
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, backoff_factor=0.3)
+        )
+        self.session.mount("https://", adapter)
+        
+    def _build_params(self,
+                      query: str,
+                      language: str,
+                      sort_by: str,
+                      page_size: int,
+                      page: int,
+                      days_back: int) -> Dict[str, Any]:
+        """
+        Build the NewsAPI query parameters.
+        
+        Args:
+            query (str): Search query term or phrase
+            language (str): Language of articles
+            sort_by (str): Sort order
+            page_size (int): Number of results per page
+            page (int): Page number
+            days_back (int): Number of days to look back
+            
+        Returns:
+            Dict[str, Any]: Query parameters
+        """
+        # Calculate date range
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days_back)
+        
+        # Format dates for API
+        from_date = start_date.strftime("%Y-%m-%d")
+        to_date = end_date.strftime("%Y-%m-%d")
+        
+        return {
+            "q": query,
+            "language": language,
+            "sortBy": sort_by,
+            "pageSize": page_size,
+            "page": page,
+            "from": from_date,
+            "to": to_date
+        }
+    
     def get_articles(self, 
                     query: str, 
                     language: str = "en", 
@@ -34,29 +90,59 @@ class NewsRetriever:
         Returns:
             Dict[str, Any]: Response from NewsAPI
         """
-        # Calculate date range
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days_back)
+        params = self._build_params(query, language, sort_by, page_size, page, days_back)
         
-        # Format dates for API
-        from_date = start_date.strftime("%Y-%m-%d")
-        to_date = end_date.strftime("%Y-%m-%d")
+        response = self.session.get(self.base_url, params=params, timeout=5)
+        response.raise_for_status()  # Raise an exception for bad responses
         
-        params = {
-            "q": query,
-            "language": language,
-            "sortBy": sort_by,
-            "pageSize": page_size,
-            "page": page,
-            "from": from_date,
-            "to": to_date,
-            "apiKey": self.api_key
-        }
+        return orjson.loads(response.content)
+    
+    def async_client(self) -> httpx.AsyncClient:
+        """
+        Create an HTTP/2 async client configured for NewsAPI.
+        
+        Returns:
+            httpx.AsyncClient: Client to share between concurrent requests
+        """
+        return httpx.AsyncClient(
+            http2=True,
+            headers={"X-Api-Key": self.api_key},
+            timeout=5
+        )
+    
+    async def aget_articles(self, 
+                            query: str, 
+                            language: str = "en", 
+                            sort_by: str = "publishedAt", 
+                            page_size: int = 10, 
+                            page: int = 1,
+                            days_back: int = 7,
+                            client: httpx.AsyncClient = None) -> Dict[str, Any]:
+        """
+        Retrieve articles based on a search query without blocking the event loop.
+        
+        Args:
+            query (str): Search query term or phrase
+            language (str): Language of articles (default: 'en')
+            sort_by (str): Sort order (default: 'publishedAt')
+            page_size (int): Number of results per page (default: 10)
+            page (int): Page number (default: 1)
+            days_back (int): Number of days to look back (default: 7)
+            client (httpx.AsyncClient, optional): Client to reuse; one is created if not provided
+            
+        Returns:
+            Dict[str, Any]: Response from NewsAPI
+        """
+        params = self._build_params(query, language, sort_by, page_size, page, days_back)
         
-        response = requests.get(self.base_url, params=params)
+        if client is None:
+            async with self.async_client() as own_client:
+                response = await own_client.get(self.base_url, params=params)
+        else:
+            response = await client.get(self.base_url, params=params)
         response.raise_for_status()  # Raise an exception for bad responses
         
-        return response.json()
+        return orjson.loads(response.content)
     
     def extract_article_content(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
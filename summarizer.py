@@ -1,82 +1,434 @@
+import asyncio
+import functools
+import hashlib
+import itertools
+import json
+import logging
 import os
-from typing import List, Dict, Any, Literal
-from langchain.chains.summarize import load_summarize_chain
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from collections import OrderedDict
+from typing import List, Dict, Any, Literal, Optional, Tuple
+import numpy as np
+from langchain.callbacks.base import BaseCallbackHandler
 from langchain.docstore.document import Document
-from langchain.prompts import PromptTemplate
 from langchain_groq import ChatGroq
+from langchain.schema import LLMResult
+from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+class PromptCacheStats(BaseCallbackHandler):
+    """Tracks how many prompt tokens Groq served from its prompt cache."""
+    
+    def __init__(self):
+        """Initialize the counters."""
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+    
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of prompt tokens that were cached."""
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+    
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        """
+        Record the token usage of a finished LLM call.
+        
+        Args:
+            response (LLMResult): Result of the LLM call
+        """
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        details = usage.get("prompt_tokens_details") or {}
+        self.prompt_tokens += usage.get("prompt_tokens") or 0
+        self.cached_tokens += details.get("cached_tokens") or 0
+        
+        logger.debug(
+            "Groq prompt cache: %d of %d prompt tokens cached (%.0f%%)",
+            self.cached_tokens, self.prompt_tokens, 100 * self.hit_rate
+        )
 
 class Summarizer:
-    """Implements LangChain summarization chains for news articles."""
+    """Implements LLM summarization of news articles."""
     
-    def __init__(self, groq_api_key: str = None):
+    def __init__(self, 
+                 groq_api_key: str = None, 
+                 semantic_threshold: float = 0.92, 
+                 semantic_cache_size: int = 1024,
+                 exact_cache_size: int = 512,
+                 cache_path: str = None):
         """
         Initialize the summarizer.
         
         Args:
             groq_api_key (str, optional): API key for Groq. If not provided, 
                                         it will look for GROQ_API_KEY in environment variables.
+            semantic_threshold (float): Cosine similarity above which a cached summary
+                                        of a near-duplicate article is reused
+            semantic_cache_size (int): Maximum number of summaries kept per summary type
+            exact_cache_size (int): Maximum number of summaries kept for identical articles
+            cache_path (str, optional): JSON file to persist identical-article summaries to
         """
         self.groq_api_key = groq_api_key or os.environ.get("GROQ_API_KEY")
         if not self.groq_api_key:
             raise ValueError("Groq API key is required. Please provide it or set GROQ_API_KEY environment variable.")
         
-        # Initialize the language model
+        # Initialize the language model; summarize_batch uses it for multi-article replies
+        self.prompt_cache_stats = PromptCacheStats()
         self.llm = ChatGroq(
             api_key=self.groq_api_key,
             model_name="mixtral-8x7b-32768",
             temperature=0.7,
-            max_tokens=4096
+            max_tokens=4096,
+            callbacks=[self.prompt_cache_stats]
         )
         
-        # Text splitter for long documents
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len
+        # Per-type models cap generation at what each summary needs; the low
+        # brief temperature also makes repeated summaries more consistent
+        self._llm_brief = ChatGroq(
+            api_key=self.groq_api_key,
+            model_name="mixtral-8x7b-32768",
+            temperature=0.2,
+            max_tokens=96,
+            callbacks=[self.prompt_cache_stats]
+        )
+        self._llm_detailed = ChatGroq(
+            api_key=self.groq_api_key,
+            model_name="mixtral-8x7b-32768",
+            temperature=0.7,
+            max_tokens=384,
+            callbacks=[self.prompt_cache_stats]
         )
         
-        # Define prompt templates
-        self.brief_template = """
-        Write a brief summary of the following article in 1-2 sentences:
+        # Chunking for long documents
+        self.chunk_size = 1000
+        self.chunk_overlap = 200
         
-        {text}
+        # Prepared chunks per article, so brief and detailed summaries of the
+        # same article split it only once
+        self.doc_cache_size = 256
+        self._doc_cache: OrderedDict = OrderedDict()
         
-        BRIEF SUMMARY:
-        """
+        # Define prompt templates. Static instructions come first and the
+        # article last, so consecutive calls share a prefix Groq can cache
+        self.prompt_prefix = "You are a news summarizer. Summarize the news article that follows.\n"
         
-        self.detailed_template = """
-        Write a detailed summary of the following article in one paragraph:
+        self.brief_template = (
+            self.prompt_prefix
+            + "Write a brief summary of the article in 1-2 sentences.\n\n"
+            + "ARTICLE:\n{text}\n\n"
+            + "BRIEF SUMMARY:"
+        )
         
-        {text}
+        self.detailed_template = (
+            self.prompt_prefix
+            + "Write a detailed summary of the article in one paragraph.\n\n"
+            + "ARTICLE:\n{text}\n\n"
+            + "DETAILED SUMMARY:"
+        )
         
-        DETAILED SUMMARY:
-        """
+        # Articles shorter than this (in characters) are summarized in a single call;
+        # longer brief summaries map-reduce over chunks
+        self.stuff_max_chars = 3000
+        
+        self.batch_template = (
+            "You are a news summarizer. Summarize each of the news articles that follow.\n"
+            "Respond with only a JSON array containing one object per article, in the same order, "
+            "of the form {{\"id\": <article id>, \"summary\": \"<summary>\"}}.\n"
+            "Each summary must be {length}.\n\n"
+            "{articles}\n\n"
+            "JSON:"
+        )
+        self.batch_lengths = {
+            "brief": "brief, in 1-2 sentences",
+            "detailed": "detailed, in one paragraph"
+        }
+        # Output tokens budgeted per article in a batch reply: the per-type
+        # summary cap plus the JSON wrapping around it
+        self.batch_item_tokens = {
+            "brief": self._llm_brief.max_tokens + 32,
+            "detailed": self._llm_detailed.max_tokens + 32
+        }
+        
+        # Semantic cache: near-duplicate articles (wire copies, syndicated
+        # reprints) reuse an earlier summary instead of calling the LLM
+        self.embedder = SentenceTransformer("all-MiniLM-L6-v2")
+        self.semantic_threshold = semantic_threshold
+        self.semantic_cache_size = semantic_cache_size
+        self._semantic_cache: Dict[str, OrderedDict] = {"brief": OrderedDict(), "detailed": OrderedDict()}
+        self._semantic_matrices: Dict[str, Tuple[np.ndarray, List[int]]] = {}
+        self._semantic_keys = itertools.count()
+        
+        # Exact cache keyed by a hash of the fields that make up the prompt;
+        # checked before the semantic cache because it needs no embedding
+        self.exact_cache_size = exact_cache_size
+        self.cache_path = cache_path
+        self.exact_cache: OrderedDict = OrderedDict()
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r") as f:
+                    self.exact_cache.update(json.load(f))
+            except json.JSONDecodeError:
+                print(f"Error decoding summary cache file. Starting with an empty cache.")
     
-    def _prepare_document(self, article: Dict[str, Any]) -> List[Document]:
+    def _article_text(self, article: Dict[str, Any]) -> str:
         """
-        Prepare an article for summarization.
+        Build the text to summarize from an article.
         
         Args:
             article (Dict[str, Any]): Article content
             
         Returns:
-            List[Document]: List of LangChain Document objects
+            str: Article text
         """
-        # Combine title, description, and content
-        text = f"Title: {article['title']}\n\n"
-        text += f"Source: {article['source']}\n\n"
+        # Combine title, description, and content; the labels always appear
+        # in this order so prompts stay structurally identical
+        parts = [f"Title: {article['title']}", f"Source: {article['source']}"]
         
         if article.get('description'):
-            text += f"Description: {article['description']}\n\n"
+            parts.append(f"Description: {article['description']}")
             
         if article.get('content'):
-            text += f"Content: {article['content']}\n\n"
+            parts.append(f"Content: {article['content']}")
+        
+        return "\n\n".join(parts)
+    
+    def _split_text(self, text: str) -> List[str]:
+        """
+        Split text into fixed-size overlapping chunks.
+        
+        News articles are a few KB at most, so a single pass over character
+        offsets is enough; no separator hierarchy is needed.
+        
+        Args:
+            text (str): Text to split
+            
+        Returns:
+            List[str]: Text chunks
+        """
+        if len(text) <= self.chunk_size:
+            return [text]
+        
+        step = self.chunk_size - self.chunk_overlap
+        return [text[i:i + self.chunk_size] for i in range(0, len(text) - self.chunk_overlap, step)]
+    
+    def _prepare_document(self, text: str) -> List[Document]:
+        """
+        Prepare article text for summarization.
+        
+        Args:
+            text (str): Article text, as built by _article_text
+            
+        Returns:
+            List[Document]: List of LangChain Document objects
+        """
+        # Key on the text itself so an article updated under the same URL is re-split
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        
+        docs = self._doc_cache.get(key)
+        if docs is not None:
+            self._doc_cache.move_to_end(key)
+            return docs
         
         # Split text into chunks if it's too long
-        docs = self.text_splitter.create_documents([text])
+        docs = [Document(page_content=chunk) for chunk in self._split_text(text)]
+        
+        self._doc_cache[key] = docs
+        if len(self._doc_cache) > self.doc_cache_size:
+            self._doc_cache.popitem(last=False)
         return docs
     
+    def _exact_key(self, article: Dict[str, Any], summary_type: str) -> str:
+        """
+        Hash the article fields used for summarization together with the summary type.
+        
+        Args:
+            article (Dict[str, Any]): Article content
+            summary_type (str): Type of summary
+            
+        Returns:
+            str: SHA-256 hex digest
+        """
+        payload = {
+            "title": article.get("title"),
+            "source": article.get("source"),
+            "description": article.get("description"),
+            "content": article.get("content"),
+            "summary_type": summary_type
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+    
+    def _exact_lookup(self, key: str) -> Optional[str]:
+        """
+        Get the cached summary of an identical article.
+        
+        Args:
+            key (str): Exact cache key
+            
+        Returns:
+            Optional[str]: Cached summary, or None if not cached
+        """
+        summary = self.exact_cache.get(key)
+        if summary is not None:
+            self.exact_cache.move_to_end(key)
+        return summary
+    
+    def _exact_store(self, key: str, summary: str) -> None:
+        """
+        Add a summary to the exact cache, evicting the least recently used entry.
+        
+        Args:
+            key (str): Exact cache key
+            summary (str): Generated summary
+        """
+        self.exact_cache[key] = summary
+        if len(self.exact_cache) > self.exact_cache_size:
+            self.exact_cache.popitem(last=False)
+        
+        if self.cache_path:
+            with open(self.cache_path, "w") as f:
+                json.dump(self.exact_cache, f, indent=2)
+    
+    def _semantic_lookup(self, vector: np.ndarray, summary_type: str) -> Optional[str]:
+        """
+        Find a cached summary of a near-duplicate article.
+        
+        Args:
+            vector (np.ndarray): Normalized embedding of the article text
+            summary_type (str): Type of summary requested
+            
+        Returns:
+            Optional[str]: Cached summary, or None if no article is similar enough
+        """
+        entries = self._semantic_cache[summary_type]
+        if not entries:
+            return None
+        
+        # Stack cached vectors once per change so lookups are a single matmul
+        if summary_type not in self._semantic_matrices:
+            keys = list(entries)
+            self._semantic_matrices[summary_type] = (np.stack([entries[key][0] for key in keys]), keys)
+        matrix, keys = self._semantic_matrices[summary_type]
+        
+        sims = matrix @ vector
+        best = int(np.argmax(sims))
+        if sims[best] <= self.semantic_threshold:
+            return None
+        
+        key = keys[best]
+        entries.move_to_end(key)
+        return entries[key][1]
+    
+    def _semantic_store(self, vector: np.ndarray, summary_type: str, summary: str) -> None:
+        """
+        Add a summary to the semantic cache, evicting the least recently used entry.
+        
+        Args:
+            vector (np.ndarray): Normalized embedding of the article text
+            summary_type (str): Type of summary
+            summary (str): Generated summary
+        """
+        entries = self._semantic_cache[summary_type]
+        entries[next(self._semantic_keys)] = (vector, summary)
+        if len(entries) > self.semantic_cache_size:
+            entries.popitem(last=False)
+        self._semantic_matrices.pop(summary_type, None)
+    
+    def _select_strategy(self, docs: List[Document], summary_type: str) -> Tuple[str, ChatGroq, bool]:
+        """
+        Select the prompt, model and strategy for an article and summary type.
+        
+        Args:
+            docs (List[Document]): Prepared article chunks
+            summary_type (str): Type of summary to generate ("brief" or "detailed")
+            
+        Returns:
+            Tuple[str, ChatGroq, bool]: Prompt template, model, and whether to
+                                        summarize chunks separately first (map-reduce)
+        """
+        if summary_type != "brief":
+            return self.detailed_template, self._llm_detailed, False
+        
+        # Map-reduce costs one LLM call per chunk plus a combine call, so it is
+        # only used when the article is too long for one
+        map_reduce = len(docs) > 1 and sum(len(doc.page_content) for doc in docs) >= self.stuff_max_chars
+        return self.brief_template, self._llm_brief, map_reduce
+    
+    @staticmethod
+    def _render(template: str, text: str) -> str:
+        """
+        Fill the single {text} slot of a prompt template.
+        
+        Args:
+            template (str): Prompt template
+            text (str): Text to insert
+            
+        Returns:
+            str: Prompt
+        """
+        return template.replace("{text}", text)
+    
+    def _generate(self, text: str, summary_type: str) -> str:
+        """
+        Generate a summary of an article with the LLM.
+        
+        Args:
+            text (str): Article text, as built by _article_text
+            summary_type (str): Type of summary to generate ("brief" or "detailed")
+            
+        Returns:
+            str: Generated summary
+        """
+        docs = self._prepare_document(text)
+        template, llm, map_reduce = self._select_strategy(docs, summary_type)
+        
+        if map_reduce:
+            # Summarize each chunk, then summarize the concatenated partial summaries;
+            # otherwise the unsplit text goes in one call, without overlapping chunks
+            partials = [llm.invoke(self._render(template, doc.page_content)).content for doc in docs]
+            text = "\n\n".join(partials)
+        
+        summary = llm.invoke(self._render(template, text)).content
+        return summary.strip()
+    
+    async def _agenerate(self, text: str, summary_type: str) -> str:
+        """
+        Generate a summary of an article with the LLM without blocking the event loop.
+        
+        The map step of a map-reduce summary runs its chunks concurrently.
+        
+        Args:
+            text (str): Article text, as built by _article_text
+            summary_type (str): Type of summary to generate ("brief" or "detailed")
+            
+        Returns:
+            str: Generated summary
+        """
+        docs = self._prepare_document(text)
+        template, llm, map_reduce = self._select_strategy(docs, summary_type)
+        
+        if map_reduce:
+            # Summarize each chunk, then summarize the concatenated partial summaries;
+            # otherwise the unsplit text goes in one call, without overlapping chunks
+            replies = await asyncio.gather(
+                *[llm.ainvoke(self._render(template, doc.page_content)) for doc in docs]
+            )
+            text = "\n\n".join(reply.content for reply in replies)
+        
+        summary = (await llm.ainvoke(self._render(template, text))).content
+        return summary.strip()
+    
+    def get_prompt_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get Groq prompt cache usage for this summarizer.
+        
+        Returns:
+            Dict[str, Any]: Prompt tokens sent, tokens served from cache, and hit rate
+        """
+        return {
+            "prompt_tokens": self.prompt_cache_stats.prompt_tokens,
+            "cached_tokens": self.prompt_cache_stats.cached_tokens,
+            "hit_rate": self.prompt_cache_stats.hit_rate
+        }
+    
     def summarize(self, 
                  article: Dict[str, Any], 
                  summary_type: Literal["brief", "detailed"] = "brief") -> str:
@@ -90,30 +442,175 @@ class Summarizer:
         Returns:
             str: Generated summary
         """
-        docs = self._prepare_document(article)
-        
-        if summary_type == "brief":
-            # Use map_reduce chain for brief summary
-            prompt_template = PromptTemplate(template=self.brief_template, input_variables=["text"])
-            chain = load_summarize_chain(
-                self.llm,
-                chain_type="map_reduce",
-                map_prompt=prompt_template,
-                combine_prompt=prompt_template,
-                verbose=False
+        key = self._exact_key(article, summary_type)
+        summary = self._exact_lookup(key)
+        if summary is not None:
+            return summary
+        
+        text = self._article_text(article)
+        vector = self.embedder.encode(text, normalize_embeddings=True)
+        
+        summary = self._semantic_lookup(vector, summary_type)
+        if summary is None:
+            summary = self._generate(text, summary_type)
+            self._semantic_store(vector, summary_type, summary)
+        self._exact_store(key, summary)
+        return summary
+    
+    async def asummarize(self, 
+                         article: Dict[str, Any], 
+                         summary_type: Literal["brief", "detailed"] = "brief") -> str:
+        """
+        Generate a summary of an article asynchronously.
+        
+        Args:
+            article (Dict[str, Any]): Article content
+            summary_type (str): Type of summary to generate ("brief" or "detailed")
+            
+        Returns:
+            str: Generated summary
+        """
+        key = self._exact_key(article, summary_type)
+        summary = self._exact_lookup(key)
+        if summary is not None:
+            return summary
+        
+        text = self._article_text(article)
+        # Encode in a worker thread so concurrent summaries are not blocked behind it
+        vector = await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self.embedder.encode, text, normalize_embeddings=True)
+        )
+        
+        summary = self._semantic_lookup(vector, summary_type)
+        if summary is None:
+            summary = await self._agenerate(text, summary_type)
+            self._semantic_store(vector, summary_type, summary)
+        self._exact_store(key, summary)
+        return summary
+    
+    async def summarize_many(self, 
+                             articles: List[Dict[str, Any]], 
+                             summary_type: Literal["brief", "detailed"] = "brief", 
+                             concurrency: int = 8) -> List[str]:
+        """
+        Generate summaries for several articles with concurrent LLM requests.
+        
+        Args:
+            articles (List[Dict[str, Any]]): List of article content
+            summary_type (str): Type of summary to generate ("brief" or "detailed")
+            concurrency (int): Maximum number of articles summarized at once,
+                               to stay within Groq rate limits
+            
+        Returns:
+            List[str]: Generated summaries, in the order of articles
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def summarize_one(article: Dict[str, Any]) -> str:
+            async with semaphore:
+                return await self.asummarize(article, summary_type)
+        
+        return await asyncio.gather(*[summarize_one(article) for article in articles])
+    
+    def summarize_batch(self, 
+                        articles: List[Dict[str, Any]], 
+                        summary_type: Literal["brief", "detailed"] = "brief") -> List[str]:
+        """
+        Generate summaries for several articles with batched LLM requests.
+        
+        Cached summaries are reused and the remaining articles are split into
+        as many requests as the output budget needs; articles the model
+        leaves out of its JSON replies are summarized individually.
+        
+        Args:
+            articles (List[Dict[str, Any]]): List of article content
+            summary_type (str): Type of summary to generate ("brief" or "detailed")
+            
+        Returns:
+            List[str]: Generated summaries, in the order of articles
+        """
+        if not articles:
+            return []
+        
+        keys = [self._exact_key(article, summary_type) for article in articles]
+        results = [self._exact_lookup(key) for key in keys]
+        
+        # Embed only the articles the exact cache missed, in one encode call
+        pending = [i for i, summary in enumerate(results) if summary is None]
+        vectors = {}
+        if pending:
+            encoded = self.embedder.encode(
+                [self._article_text(articles[i]) for i in pending],
+                normalize_embeddings=True
             )
-        else:  # detailed
-            # Use stuff chain for detailed summary
-            prompt_template = PromptTemplate(template=self.detailed_template, input_variables=["text"])
-            chain = load_summarize_chain(
-                self.llm,
-                chain_type="stuff",
-                prompt=prompt_template,
-                verbose=False
+            vectors = dict(zip(pending, encoded))
+        
+        for i in pending:
+            results[i] = self._semantic_lookup(vectors[i], summary_type)
+            if results[i] is not None:
+                self._exact_store(keys[i], results[i])
+        
+        misses = [i for i, summary in enumerate(results) if summary is None]
+        if not misses:
+            return results
+        
+        # Size each request so its JSON reply fits in the model's output budget
+        group_size = max(1, self.llm.max_tokens // self.batch_item_tokens[summary_type])
+        groups = [misses[start:start + group_size] for start in range(0, len(misses), group_size)]
+        prompts = [
+            self.batch_template.format(
+                length=self.batch_lengths[summary_type],
+                articles="\n".join(f"ARTICLE {i}:\n{self._article_text(articles[i])}" for i in group)
             )
+            for group in groups
+        ]
         
-        summary = chain.run(docs)
-        return summary.strip()
+        summaries = {}
+        for reply in self.llm.batch(prompts):
+            summaries.update(self._parse_batch_reply(reply.content))
+        
+        failed = []
+        for i in misses:
+            summary = summaries.get(i)
+            if not summary:
+                failed.append(i)
+                continue
+            self._semantic_store(vectors[i], summary_type, summary)
+            self._exact_store(keys[i], summary)
+            results[i] = summary
+        
+        # Summarize articles the replies left out concurrently, one request each
+        if failed:
+            fallback = asyncio.run(self.summarize_many([articles[i] for i in failed], summary_type))
+            for i, summary in zip(failed, fallback):
+                results[i] = summary
+        return results
+    
+    @staticmethod
+    def _parse_batch_reply(reply: str) -> Dict[int, str]:
+        """
+        Parse the summaries out of a batch JSON reply.
+        
+        Objects are decoded one at a time, so a reply cut off mid-array
+        still yields every summary that was completed.
+        
+        Args:
+            reply (str): LLM reply
+            
+        Returns:
+            Dict[int, str]: Summaries keyed by article id
+        """
+        decoder = json.JSONDecoder()
+        summaries = {}
+        start = reply.find("{")
+        while start != -1:
+            try:
+                item, end = decoder.raw_decode(reply, start)
+                summaries[int(item["id"])] = str(item["summary"]).strip()
+            except (ValueError, KeyError, TypeError):
+                end = start + 1
+            start = reply.find("{", end)
+        return summaries
 
 # Example usage
 if __name__ == "__main__":
@@ -1,59 +1,127 @@
+import atexit
 import os
-import json
+import sqlite3
+import time
+import orjson
 from typing import List, Dict, Any
 from datetime import datetime
 
 class UserManager:
     """Tracks user preferences and search history."""
     
-    def __init__(self, user_data_path: str = "user_data.json"):
+    def __init__(self, user_data_path: str = "user_data.db", legacy_json_path: str = "user_data.json"):
         """
         Initialize the user manager.
         
         Args:
-            user_data_path (str): Path to the user data JSON file
+            user_data_path (str): Path to the user data SQLite database
+            legacy_json_path (str): JSON user data file to import when the database is first created
         """
         self.user_data_path = user_data_path
-        self.user_data = self._load_user_data()
+        self.max_history = 1000
+        
+        is_new = not os.path.exists(self.user_data_path)
+        
+        # Autocommit with WAL journaling: each mutation is a small append, not a file rewrite
+        self.conn = sqlite3.connect(self.user_data_path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        
+        if is_new and legacy_json_path and os.path.exists(legacy_json_path):
+            self._import_legacy_json(legacy_json_path)
+        
+        atexit.register(self.close)
     
-    def _load_user_data(self) -> Dict[str, Any]:
-        """
-        Load user data from the JSON file.
+    def __enter__(self) -> "UserManager":
+        """Use the user manager as a context manager."""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Close the database on exit."""
+        self.close()
+    
+    def _create_schema(self) -> None:
+        """Create the tables and default preferences if they do not exist."""
+        self.conn.execute("CREATE TABLE IF NOT EXISTS prefs (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS topics (topic TEXT PRIMARY KEY)")
+        # Databases from before history had its own id keyed rows by timestamp;
+        # rebuild them so searches within one clock tick are all kept
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(history)")]
+        if columns and "id" not in columns:
+            self.conn.execute("ALTER TABLE history RENAME TO history_old")
         
-        Returns:
-            Dict[str, Any]: User data
-        """
-        if os.path.exists(self.user_data_path):
-            try:
-                with open(self.user_data_path, "r") as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                print(f"Error decoding user data file. Creating new data.")
-                return self._create_default_user_data()
-        else:
-            return self._create_default_user_data()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS history "
+            "(id INTEGER PRIMARY KEY AUTOINCREMENT, ts INTEGER, query TEXT, num_results INTEGER)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS history_ts ON history (ts)")
+        
+        if columns and "id" not in columns:
+            self.conn.execute(
+                "INSERT INTO history (ts, query, num_results) "
+                "SELECT ts, query, num_results FROM history_old ORDER BY ts"
+            )
+            self.conn.execute("DROP TABLE history_old")
+        
+        defaults = self._create_default_preferences()
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO prefs (key, value) VALUES (?, ?)",
+            [(key, orjson.dumps(value).decode()) for key, value in defaults.items()]
+        )
     
-    def _create_default_user_data(self) -> Dict[str, Any]:
+    def _create_default_preferences(self) -> Dict[str, Any]:
         """
-        Create default user data structure.
+        Create default user preferences, excluding topics.
         
         Returns:
-            Dict[str, Any]: Default user data
+            Dict[str, Any]: Default preferences
         """
         return {
-            "preferences": {
-                "topics": [],
-                "summary_type": "brief",
-                "language": "en",
-                "articles_per_topic": 5
-            },
-            "search_history": []
+            "summary_type": "brief",
+            "language": "en",
+            "articles_per_topic": 5
         }
     
-    def save_user_data(self) -> None:
-        """Save user data to the JSON file."""
-        with open(self.user_data_path, "w") as f:
-            json.dump(self.user_data, f, indent=2)
+    def _import_legacy_json(self, json_path: str) -> None:
+        """
+        Import preferences, topics and history from a JSON user data file.
+        
+        Args:
+            json_path (str): Path to the JSON user data file
+        """
+        try:
+            with open(json_path, "rb") as f:
+                user_data = orjson.loads(f.read())
+        except orjson.JSONDecodeError:
+            print(f"Error decoding user data file. Creating new data.")
+            return
+        
+        preferences = dict(user_data.get("preferences", {}))
+        for topic in preferences.pop("topics", []):
+            self.add_topic(topic)
+        self.update_preferences(preferences)
+        
+        for item in user_data.get("search_history", [])[-self.max_history:]:
+            if "ts_ns" in item:
+                ts = item["ts_ns"]
+            else:
+                ts = int(datetime.fromisoformat(item["timestamp"]).timestamp() * 1e9)
+            self.conn.execute(
+                "INSERT INTO history (ts, query, num_results) VALUES (?, ?, ?)",
+                (ts, item["query"], item["num_results"])
+            )
+    
+    def flush(self) -> None:
+        """Fold the write-ahead log back into the database file."""
+        self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        try:
+            self.conn.close()
+        except sqlite3.ProgrammingError:
+            pass
     
     def get_preferences(self) -> Dict[str, Any]:
         """
@@ -62,7 +130,12 @@ class UserManager:
         Returns:
             Dict[str, Any]: User preferences
         """
-        return self.user_data["preferences"]
+        preferences = {
+            key: orjson.loads(value)
+            for key, value in self.conn.execute("SELECT key, value FROM prefs")
+        }
+        preferences["topics"] = self.get_topics()
+        return preferences
     
     def update_preferences(self, preferences: Dict[str, Any]) -> None:
         """
@@ -71,8 +144,23 @@ class UserManager:
         Args:
             preferences (Dict[str, Any]): New preferences to update
         """
-        self.user_data["preferences"].update(preferences)
-        self.save_user_data()
+        preferences = dict(preferences)
+        
+        topics = preferences.pop("topics", None)
+        if topics is not None and list(topics) != self.get_topics():
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.execute("DELETE FROM topics")
+                self.conn.executemany("INSERT OR IGNORE INTO topics (topic) VALUES (?)", [(t,) for t in topics])
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+        
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO prefs (key, value) VALUES (?, ?)",
+            [(key, orjson.dumps(value).decode()) for key, value in preferences.items()]
+        )
     
     def add_topic(self, topic: str) -> None:
         """
@@ -81,9 +169,7 @@ class UserManager:
         Args:
             topic (str): Topic to add
         """
-        if topic not in self.user_data["preferences"]["topics"]:
-            self.user_data["preferences"]["topics"].append(topic)
-            self.save_user_data()
+        self.conn.execute("INSERT OR IGNORE INTO topics (topic) VALUES (?)", (topic,))
     
     def remove_topic(self, topic: str) -> bool:
         """
@@ -95,20 +181,17 @@ class UserManager:
         Returns:
             bool: True if topic was removed, False otherwise
         """
-        if topic in self.user_data["preferences"]["topics"]:
-            self.user_data["preferences"]["topics"].remove(topic)
-            self.save_user_data()
-            return True
-        return False
+        cursor = self.conn.execute("DELETE FROM topics WHERE topic = ?", (topic,))
+        return cursor.rowcount > 0
     
     def get_topics(self) -> List[str]:
         """
         Get all topics of interest.
         
         Returns:
-            List[str]: List of topics
+            List[str]: List of topics, in the order they were added
         """
-        return self.user_data["preferences"]["topics"]
+        return [row[0] for row in self.conn.execute("SELECT topic FROM topics ORDER BY rowid")]
     
     def add_search_history(self, query: str, num_results: int) -> None:
         """
@@ -118,13 +201,15 @@ class UserManager:
             query (str): Search query
             num_results (int): Number of results found
         """
-        timestamp = datetime.now().isoformat()
-        self.user_data["search_history"].append({
-            "query": query,
-            "timestamp": timestamp,
-            "num_results": num_results
-        })
-        self.save_user_data()
+        self.conn.execute(
+            "INSERT INTO history (ts, query, num_results) VALUES (?, ?, ?)",
+            (time.time_ns(), query, num_results)
+        )
+        # Keep only the most recent searches
+        self.conn.execute(
+            "DELETE FROM history WHERE id < (SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (self.max_history - 1,)
+        )
     
     def get_search_history(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -134,9 +219,21 @@ class UserManager:
             limit (int): Maximum number of history items to return
             
         Returns:
-            List[Dict[str, Any]]: List of search history items
+            List[Dict[str, Any]]: List of search history items, oldest first
         """
-        return self.user_data["search_history"][-limit:]
+        rows = self.conn.execute(
+            "SELECT ts, query, num_results FROM history ORDER BY id DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        
+        return [
+            {
+                "query": query,
+                "timestamp": datetime.fromtimestamp(ts / 1e9).isoformat(),
+                "num_results": num_results
+            }
+            for ts, query, num_results in reversed(rows)
+        ]
 
 # Example usage
 if __name__ == "__main__":